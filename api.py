@@ -14,12 +14,15 @@ The API returns structured dialogue with sprite selections for a visual novel fr
 import os
 import sys
 import re
+import atexit
+import logging
+import logging.handlers
+import queue
 from typing import Dict, Any, List, Tuple
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from dotenv import load_dotenv
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -30,6 +33,8 @@ print("🔍 Debug: Files in current directory:", os.listdir('.'))
 
 try:
     from worry_butler import WorryButler
+    from worry_butler.config import get_config
+    from worry_butler import jsonio
     print("✅ WorryButler imported successfully")
     
     # Test agent imports
@@ -54,16 +59,26 @@ except Exception as import_error:
     traceback.print_exc()
     raise
 
-# Load environment variables
-load_dotenv()
+# Load configuration (environment variables and .env file)
+config = get_config()
+logging.basicConfig(level=config.log_level)
+
+# Request handlers only enqueue log records; a background thread writes them,
+# so a slow or blocked stderr pipe never stalls the event loop
+_log_queue = queue.SimpleQueue()
+_root_logger = logging.getLogger()
+_log_listener = logging.handlers.QueueListener(_log_queue, *_root_logger.handlers, respect_handler_level=True)
+_root_logger.handlers = [logging.handlers.QueueHandler(_log_queue)]
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 # Debug environment loading
 import os
 print(f"🔍 Debug: Current working directory: {os.getcwd()}")
 print(f"🔍 Debug: .env file exists: {os.path.exists('.env')}")
 print(f"🔍 Debug: Environment variables loaded:")
-print(f"🔍 Debug: OPENAI_API_KEY: {'SET' if os.getenv('OPENAI_API_KEY') else 'NOT SET'}")
-print(f"🔍 Debug: OLLAMA_MODEL: {os.getenv('OLLAMA_MODEL', 'NOT SET')}")
+print(f"🔍 Debug: OPENAI_API_KEY: {'SET' if config.openai_api_key else 'NOT SET'}")
+print(f"🔍 Debug: OLLAMA_MODEL: {config.ollama_model}")
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -80,7 +95,7 @@ try:
     print("🚀 Starting Worry Butler initialization...")
     
     # Check if OpenAI key is available
-    openai_key = os.getenv("OPENAI_API_KEY")
+    openai_key = config.openai_api_key
     
     # Priority: OpenAI > Ollama
     if openai_key:
@@ -94,9 +109,9 @@ try:
         provider = "Ollama"
         print("🎯 Using Ollama (fallback)")
     
-    # Get Ollama configuration from environment
-    ollama_model = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
-    ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    # Get Ollama configuration
+    ollama_model = config.ollama_model
+    ollama_base_url = config.ollama_base_url
     
     print(f"🔧 Initializing WorryButler with provider: {provider}")
     print(f"🔧 Parameters: use_openai={use_openai}, use_ollama={use_ollama}")
@@ -128,6 +143,10 @@ class WorryRequest(BaseModel):
     worry: str
     description: str = "The player's anxiety statement to process through the courtroom"
 
+class WorryBatchRequest(BaseModel):
+    worries: List[str]
+    description: str = "Several anxiety statements to process concurrently"
+
 class DialogueLine(BaseModel):
     character: str
     text: str
@@ -396,6 +415,33 @@ def create_ace_attorney_dialogue(original_worry: str, agent_responses: Dict[str,
     
     return dialogue_sequence
 
+def build_visual_novel_response(worry: str, result: Dict[str, Any]) -> VisualNovelResponse:
+    """
+    Turn a processed worry into the visual novel response.
+    
+    Args:
+        worry: The player's anxiety statement
+        result: The WorryButler result for it
+        
+    Returns:
+        VisualNovelResponse with complete dialogue sequence and sprite selections
+    """
+    # Transform into Ace Attorney style dialogue
+    dialogue_sequence = create_ace_attorney_dialogue(worry, result)
+    
+    # Create the visual novel response
+    return VisualNovelResponse(
+        original_worry=worry,
+        dialogue_sequence=dialogue_sequence,
+        metadata={
+            "workflow_completed": True,
+            "agent_sequence": ["prosecutor", "defense", "judge"],
+            "style": "ace_attorney_visual_novel",
+            "sprite_count": len(dialogue_sequence),
+            "processing_notes": "Three-agent courtroom drama completed successfully"
+        }
+    )
+
 @app.get("/", response_class=HTMLResponse)
 async def root():
     """
@@ -838,8 +884,8 @@ async def process_worry(request: WorryRequest):
         raise HTTPException(status_code=500, detail="Worry Butler not initialized")
     
     try:
-        # Process the worry through the three-agent system
-        result = butler.process_worry(request.worry)
+        # Process the worry through the three-agent system without blocking the event loop
+        result = await butler.aprocess_worry(request.worry)
         
         # Debug: Check response types
         print(f"🔍 Debug: Agent response types:")
@@ -847,25 +893,63 @@ async def process_worry(request: WorryRequest):
         print(f"  • Therapist: {type(result['therapist_response'])}")
         print(f"  • Executive: {type(result['executive_summary'])}")
         
-        # Transform into Ace Attorney style dialogue
-        dialogue_sequence = create_ace_attorney_dialogue(request.worry, result)
-        
-        # Create the visual novel response
-        return VisualNovelResponse(
-            original_worry=request.worry,
-            dialogue_sequence=dialogue_sequence,
-            metadata={
-                "workflow_completed": True,
-                "agent_sequence": ["prosecutor", "defense", "judge"],
-                "style": "ace_attorney_visual_novel",
-                "sprite_count": len(dialogue_sequence),
-                "processing_notes": "Three-agent courtroom drama completed successfully"
-            }
-        )
+        return build_visual_novel_response(request.worry, result)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing worry: {str(e)}")
 
+@app.post("/process-worries", response_model=List[VisualNovelResponse])
+async def process_worries(request: WorryBatchRequest):
+    """
+    Process several worries at once.
+    
+    Duplicate worries are answered once and the rest are sent to the LLM
+    concurrently, so an Ollama server with OLLAMA_NUM_PARALLEL > 1 works on
+    them in parallel.
+    
+    Args:
+        request: WorryBatchRequest containing the anxiety statements
+        
+    Returns:
+        One VisualNovelResponse per worry, in request order
+    """
+    if not butler:
+        raise HTTPException(status_code=500, detail="Worry Butler not initialized")
+    
+    try:
+        results = await butler.aprocess_worries_batch(request.worries)
+        return [build_visual_novel_response(worry, result) for worry, result in zip(request.worries, results)]
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing worries: {str(e)}")
+
+@app.post("/process-worry/stream")
+async def process_worry_stream(request: WorryRequest):
+    """
+    Stream the courtroom dialogue as Server-Sent Events while it is generated.
+    
+    Each event is a JSON object: {"key": role, "delta": text} while the model
+    writes, then {"done": true, "result": {...}} with the complete outputs,
+    or {"error": message} if processing fails.
+    
+    Args:
+        request: WorryRequest containing the player's anxiety statement
+        
+    Returns:
+        StreamingResponse with media type text/event-stream
+    """
+    if not butler:
+        raise HTTPException(status_code=500, detail="Worry Butler not initialized")
+    
+    async def event_stream():
+        try:
+            async for event in butler.astream_worry(request.worry):
+                yield f"data: {jsonio.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"data: {jsonio.dumps({'error': f'Error processing worry: {str(e)}'})}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.get("/test-dialogue")
 async def test_dialogue():
     """
@@ -957,7 +1041,7 @@ async def get_provider_info():
         if not butler:
             raise HTTPException(status_code=500, detail="Worry Butler not initialized")
         
-        return butler.get_provider_info()
+        return dict(butler.get_provider_info())
     except Exception as e:
         print(f"❌ Error in provider-info endpoint: {e}")
         print(f"❌ Error type: {type(e)}")
@@ -1052,7 +1136,7 @@ if __name__ == "__main__":
     import uvicorn
     
     # Check configuration
-    openai_key = os.getenv("OPENAI_API_KEY")
+    openai_key = config.openai_api_key
     
     if openai_key:
         print("🔧 Using OpenAI API")
@@ -6,29 +6,63 @@ This script demonstrates how to use the Worry Butler to process worries
 through the three-agent workflow.
 """
 
+import argparse
+import logging
 import os
 import sys
-from dotenv import load_dotenv
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from worry_butler import WorryButler
+from worry_butler.config import get_config
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+    
+    Args:
+        argv: Optional argument list (defaults to sys.argv)
+        
+    Returns:
+        Parsed arguments namespace
+    """
+    parser = argparse.ArgumentParser(description="Put your worries on trial from the command line.")
+    parser.add_argument(
+        "--provider",
+        choices=["ollama", "openai"],
+        default=None,
+        help="AI provider to use (default: detect from environment and ask)"
+    )
+    return parser.parse_args(argv)
 
 def main():
     """
     Main function that demonstrates the Worry Butler system.
     """
+    args = parse_args()
+    
     print("🤖 Welcome to Worry Butler! 🧠💭")
     print("=" * 50)
     
-    # Load environment variables
-    load_dotenv()
+    # Load configuration (environment variables and .env file)
+    config = get_config()
+    logging.basicConfig(level=config.log_level)
     
     # Check configuration and determine provider
-    openai_key = os.getenv("OPENAI_API_KEY")
+    openai_key = config.openai_api_key
     
-    if openai_key:
+    if args.provider == "openai":
+        if not openai_key:
+            print("❌ --provider openai requires OPENAI_API_KEY in your environment or .env file")
+            return 1
+        use_openai = True
+        use_ollama = False
+        print("🚀 Using OpenAI API")
+    elif args.provider == "ollama":
+        use_openai = False
+        use_ollama = True
+        print("🚀 Using Ollama (open-source models)")
+    elif openai_key:
         print("🔑 OpenAI API key found")
         choice = input("Choose AI provider:\n1. Ollama (open-source, local) - RECOMMENDED\n2. OpenAI (cloud-based, requires API key)\nEnter choice (1 or 2): ").strip()
         
@@ -50,16 +84,13 @@ def main():
         # Initialize the Worry Butler
         print("\n🚀 Initializing Worry Butler...")
         
-        # Get Ollama configuration from environment
-        ollama_model = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
-        ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-        
+        # Imported here so --help and argument errors do not load the agents and langchain
+        from worry_butler import WorryButler
         butler = WorryButler(
-            use_grok=False, # Removed Grok API support
             use_openai=use_openai,
             use_ollama=use_ollama,
-            ollama_model=ollama_model,
-            ollama_base_url=ollama_base_url
+            ollama_model=config.ollama_model,
+            ollama_base_url=config.ollama_base_url
         )
         
         # Show provider information
@@ -138,8 +169,8 @@ def main():
             print("\n💡 For Ollama setup help:")
             print("   1. Install Ollama: https://ollama.ai")
             print("   2. Start Ollama: ollama serve")
-            print("   3. Pull your model: ollama pull llama3.1:8b")
+            print(f"   3. Pull your model: ollama pull {config.ollama_model}")
         print("Please check your configuration and try again.")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
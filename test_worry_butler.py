@@ -149,6 +149,321 @@ def test_workflow_structure():
         print(f"❌ Failed to test workflow structure: {e}")
         return False
 
+def test_json_stream_parsing():
+    """Test that JSON split across stream chunks is parsed correctly."""
+    print("\n🧪 Testing streamed JSON parsing...")
+    
+    try:
+        from worry_butler.agents.concierge_agent import _BundleStreamParser
+        from worry_butler.jsonio import JsonObjectScanner
+        
+        # Escaped quotes, braces inside strings and a \u escape, cut every 3 characters
+        raw = (
+            '```json\n{"overthinker": "He said \\"{doom}\\" twice", '
+            '"therapist": "Breathe \\u2014 it\'s fine", "executive": "Pay rent."}\n```'
+        )
+        chunks = [raw[i:i + 3] for i in range(0, len(raw), 3)]
+        
+        parser = _BundleStreamParser()
+        text = {}
+        for chunk in chunks:
+            for key, delta in parser.feed(chunk):
+                text[key] = text.get(key, "") + delta
+        
+        if text == {
+            "overthinker": 'He said "{doom}" twice',
+            "therapist": "Breathe \u2014 it's fine",
+            "executive": "Pay rent."
+        }:
+            print("✅ Stream parser decodes values split across chunks")
+        else:
+            print(f"❌ Stream parser produced {text!r}")
+            return False
+        
+        scanner = JsonObjectScanner()
+        complete_at = None
+        for i, chunk in enumerate(chunks):
+            if scanner.feed(chunk):
+                complete_at = i
+                break
+        
+        obj = raw[scanner.start:scanner.end] if complete_at is not None else ""
+        if obj.startswith("{") and obj.endswith('"Pay rent."}') and complete_at < len(chunks) - 1:
+            print("✅ Object scanner ignores braces in strings and stops at the closing brace")
+        else:
+            print(f"❌ Object scanner found {obj!r}")
+            return False
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Failed to test streamed JSON parsing: {e}")
+        return False
+
+def test_batcher():
+    """Test that the batcher flushes on a full batch and on timeout."""
+    print("\n🧪 Testing worry batcher...")
+    
+    try:
+        import asyncio
+        import time
+        from worry_butler.core.batcher import WorryBatcher
+        
+        calls = []
+        
+        async def process_batch(worries):
+            calls.append(list(worries))
+            return [{"worry": worry} for worry in worries]
+        
+        async def run():
+            # Four worries fill a batch of four; the window is far too long to matter
+            batcher = WorryBatcher(process_batch, max_batch_size=4, max_wait_ms=10_000)
+            start = time.monotonic()
+            results = await asyncio.gather(*(batcher.submit(f"worry {i}") for i in range(4)))
+            full_elapsed = time.monotonic() - start
+            
+            # A lone worry goes out when its window expires
+            batcher = WorryBatcher(process_batch, max_batch_size=4, max_wait_ms=20)
+            lone = await asyncio.wait_for(batcher.submit("lonely worry"), timeout=5)
+            return results, full_elapsed, lone
+        
+        results, full_elapsed, lone = asyncio.run(run())
+        
+        if calls[0] == [f"worry {i}" for i in range(4)] and full_elapsed < 1:
+            print("✅ Full batch is flushed immediately")
+        else:
+            print(f"❌ Full batch was not flushed immediately: {calls!r}")
+            return False
+        
+        if [r["worry"] for r in results] == [f"worry {i}" for i in range(4)]:
+            print("✅ Each caller receives its own result")
+        else:
+            print(f"❌ Results were mixed up: {results!r}")
+            return False
+        
+        if lone == {"worry": "lonely worry"} and calls[1] == ["lonely worry"]:
+            print("✅ Partial batch is flushed when the window expires")
+        else:
+            print(f"❌ Partial batch was not flushed: {calls!r}")
+            return False
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Failed to test worry batcher: {e}")
+        return False
+
+def test_worry_clustering():
+    """Test that duplicate worries are grouped."""
+    print("\n🧪 Testing worry clustering...")
+    
+    try:
+        from worry_butler.dedup import cluster_worries
+        
+        worries = ["I might lose my job", "  i MIGHT lose   my job ", "My cat ignores me", "I might lose my job"]
+        assignment = cluster_worries(worries)
+        
+        if assignment == [0, 0, 2, 0]:
+            print("✅ Worries differing only in case and spacing share a representative")
+        else:
+            print(f"❌ Unexpected grouping without embeddings: {assignment!r}")
+            return False
+        
+        # Toy embedding: the first two worries point the same way
+        vectors = {"job": [1.0, 0.0], "work": [0.99, 0.1], "cat": [0.0, 1.0]}
+        assignment = cluster_worries(["job", "work", "cat"], embed_fn=lambda texts: [vectors[t] for t in texts])
+        
+        if assignment == [0, 0, 2]:
+            print("✅ Similar embeddings are grouped")
+        else:
+            print(f"❌ Unexpected grouping with embeddings: {assignment!r}")
+            return False
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Failed to test worry clustering: {e}")
+        return False
+
+def test_semantic_cache():
+    """Test semantic cache lookups, expiry and persistence."""
+    print("\n🧪 Testing semantic cache...")
+    
+    try:
+        import tempfile
+        import time
+        from worry_butler.cache import SemanticCache
+        
+        def embed(texts):
+            return [[1.0, 0.0] if "job" in text else [0.0, 1.0] for text in texts]
+        
+        cache = SemanticCache(embed, threshold=0.9, ttl_seconds=60)
+        cache.put(cache.embed("losing my job"), {"executive": "Update your CV."})
+        
+        if cache.get(cache.embed("job worries")) == {"executive": "Update your CV."} \
+                and cache.get(cache.embed("my cat")) is None:
+            print("✅ Similar texts hit and different texts miss")
+        else:
+            print("❌ Semantic cache lookups are wrong")
+            return False
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.json")
+            cache.save(path)
+            restored = SemanticCache(embed, threshold=0.9, ttl_seconds=60)
+            loaded = restored.load(path)
+            
+            if loaded == 1 and restored.get(restored.embed("job")) == {"executive": "Update your CV."}:
+                print("✅ Entries survive a save/load round trip")
+            else:
+                print(f"❌ Save/load round trip lost entries (loaded {loaded})")
+                return False
+            
+            short_lived = SemanticCache(embed, threshold=0.9, ttl_seconds=0.05)
+            short_lived.put(short_lived.embed("job"), "stale")
+            short_lived.save(path)
+            time.sleep(0.1)
+            
+            if short_lived.get(short_lived.embed("job")) is None and SemanticCache(embed).load(path) == 0:
+                print("✅ Expired entries are neither returned nor loaded")
+            else:
+                print("❌ Expired entries were still used")
+                return False
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Failed to test semantic cache: {e}")
+        return False
+
+def test_first_sentence():
+    """Test that executive verdicts are cut after their first sentence only."""
+    print("\n🧪 Testing executive verdict trimming...")
+    
+    try:
+        from worry_butler.agents.executive_agent import _first_sentence
+        
+        cases = {
+            "Pay the bill. Then rest.": "Pay the bill.",
+            "See Dr. Lee at 7 a.m. Monday. Then relax.": "See Dr. Lee at 7 a.m. Monday.",
+            "Pick one task, e.g. Laundry, and start.": "Pick one task, e.g. Laundry, and start.",
+            "The U.S. Army trains.": "The U.S. Army trains.",
+            "\"Breathe.\" Then act.": "\"Breathe.\"",
+            ". The court orders rest. Yes.": "The court orders rest.",
+            "You've got this": "You've got this",
+            "": ""
+        }
+        
+        for text, expected in cases.items():
+            result = _first_sentence(text)
+            if result != expected:
+                print(f"❌ {text!r} was trimmed to {result!r}, expected {expected!r}")
+                return False
+        
+        print("✅ Verdicts keep abbreviations and lose only the extra sentences")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Failed to test executive verdict trimming: {e}")
+        return False
+
+def _stub_concierge(main_reply, repair_reply, json_mode=False, main_delay=0.0, repair_delay=0.0):
+    """Build a ConciergeAgent whose model calls return canned replies (no provider needed)."""
+    import asyncio
+    from collections import OrderedDict
+    from worry_butler.agents.concierge_agent import ConciergeAgent
+    
+    agent = ConciergeAgent.__new__(ConciergeAgent)
+    agent.json_mode = json_mode
+    agent.speculative_repair = False
+    agent.semantic_cache = None
+    agent._exact_cache = OrderedDict()
+    agent.calls = []
+    
+    def main(message, context=None):
+        agent.calls.append("main")
+        return main_reply
+    
+    def repair(message, context=None):
+        agent.calls.append("repair")
+        return repair_reply
+    
+    async def amain(message, context=None):
+        await asyncio.sleep(main_delay)
+        return main(message)
+    
+    async def arepair(message, context=None):
+        await asyncio.sleep(repair_delay)
+        return repair(message)
+    
+    agent.stream_json = main
+    agent.process_message = repair
+    agent.astream_json = amain
+    agent.aprocess_message = arepair
+    return agent
+
+def test_concierge_fallbacks():
+    """Test the concierge's refusal, partial-JSON, repair and race branches."""
+    print("\n🧪 Testing concierge fallbacks...")
+    
+    try:
+        import asyncio
+        import json
+        
+        def bundle(name):
+            return json.dumps({"overthinker": name, "therapist": "Breathe.", "executive": "Rest."})
+        
+        partial = '{"overthinker": "I can\'t stop thinking about the rent and'
+        
+        # A refusal gets the therapeutic fallback without a repair call and is not cached
+        agent = _stub_concierge("I'm sorry, but I can't help with that.", bundle("repaired"))
+        result = agent.generate_all("I worry about rent")
+        if agent.calls == ["main"] and "rent" in result["overthinker"] and not agent._exact_cache:
+            print("✅ Refusals get the uncached therapeutic fallback")
+        else:
+            print(f"❌ Refusal handling is wrong: calls {agent.calls!r}, result {result!r}")
+            return False
+        
+        # Truncated JSON is not a refusal, even when it contains "I can't"
+        agent = _stub_concierge(partial, "still not JSON", json_mode=True)
+        try:
+            agent.generate_all("I worry about rent")
+            print("❌ Partial JSON did not raise")
+            return False
+        except ValueError:
+            pass
+        if agent.calls == ["main"]:
+            print("✅ Partial JSON raises ValueError without a repair call in JSON mode")
+        else:
+            print(f"❌ JSON mode made a repair call: {agent.calls!r}")
+            return False
+        
+        # Outside JSON mode the same output gets one repair call
+        agent = _stub_concierge(partial, bundle("repaired"))
+        result = agent.generate_all("I worry about rent")
+        if agent.calls == ["main", "repair"] and result["overthinker"] == "repaired":
+            print("✅ Unparseable output gets one repair call outside JSON mode")
+        else:
+            print(f"❌ Repair handling is wrong: calls {agent.calls!r}, result {result!r}")
+            return False
+        
+        # The race keeps the first complete bundle, whichever call produced it
+        agent = _stub_concierge(bundle("main"), bundle("repaired"), main_delay=0.2)
+        result = asyncio.run(agent._arace_repair("I worry about rent"))[0]
+        agent = _stub_concierge(bundle("main"), "not JSON", main_delay=0.05)
+        slow_result = asyncio.run(agent._arace_repair("I worry about rent"))[0]
+        if result["overthinker"] == "repaired" and slow_result["overthinker"] == "main":
+            print("✅ Speculative repair keeps the first complete bundle")
+        else:
+            print(f"❌ Speculative repair kept {result!r} and {slow_result!r}")
+            return False
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Failed to test concierge fallbacks: {e}")
+        return False
+
 def main():
     """Run all tests."""
     print("🤖 Worry Butler System Tests")
@@ -169,7 +484,13 @@ def main():
         test_imports,
         test_agent_creation,
         test_system_prompts,
-        test_workflow_structure
+        test_workflow_structure,
+        test_json_stream_parsing,
+        test_batcher,
+        test_worry_clustering,
+        test_semantic_cache,
+        test_first_sentence,
+        test_concierge_fallbacks
     ]
     
     passed = 0
@@ -2,7 +2,14 @@
 Worry Butler - A multi-agent AI system for processing anxiety and worry.
 """
 
-from .core.worry_butler import WorryButler
-
 __version__ = "1.0.0"
 __all__ = ["WorryButler"]
+
+
+def __getattr__(name):
+    # WorryButler pulls in the agents and langchain, so it is imported on first
+    # use; light modules such as worry_butler.config load without them
+    if name == "WorryButler":
+        from .core.worry_butler import WorryButler
+        return WorryButler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
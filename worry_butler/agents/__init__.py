@@ -2,8 +2,20 @@
 AI agents for the Worry Butler system.
 """
 
-from .overthinker_agent import OverthinkerAgent
-from .therapist_agent import TherapistAgent
-from .executive_agent import ExecutiveAgent
+import importlib
+
+# Agent class -> module; each is imported on first use, so importing the
+# concierge (all WorryButler needs) does not load the standalone agents
+_AGENT_MODULES = {
+    "OverthinkerAgent": ".overthinker_agent",
+    "TherapistAgent": ".therapist_agent",
+    "ExecutiveAgent": ".executive_agent",
+}
 
 __all__ = ["OverthinkerAgent", "TherapistAgent", "ExecutiveAgent"]
+
+
+def __getattr__(name):
+    if name in _AGENT_MODULES:
+        return getattr(importlib.import_module(_AGENT_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
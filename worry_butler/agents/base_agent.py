@@ -3,12 +3,168 @@ Base agent class for the Worry Butler system.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-import os
-from dotenv import load_dotenv
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Iterator, AsyncIterator, Mapping, Tuple
+import hashlib
+import json
+import logging
 
-# Load environment variables
-load_dotenv()
+from ..config import get_config
+from ..jsonio import JsonObjectScanner
+
+try:
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.messages import HumanMessage, SystemMessage
+except ImportError:
+    BaseChatModel = HumanMessage = SystemMessage = None
+
+log = logging.getLogger(__name__)
+
+# Prompt layouts; context is inserted as JSON, which models read better than a Python dict repr
+_CONTEXT_MESSAGE_TMPL = "Context: {context}\n\nMessage: {message}".format
+_FULL_PROMPT_TMPL = "{system}\n\n{message}".format
+
+def _serialize_context(context: Optional[Dict[str, Any]]) -> str:
+    """Serialize agent context to compact JSON ("" when there is none)."""
+    if not context:
+        return ""
+    return json.dumps(context, ensure_ascii=False, separators=(",", ":"), default=str)
+
+# Rough characters per token for English text; close enough for input budgets
+_CHARS_PER_TOKEN = 4
+
+def _truncate_middle(text: str, max_tokens: int) -> str:
+    """
+    Shorten a text to about max_tokens by cutting out its middle.
+    
+    The opening and the conclusion of a response carry most of its meaning,
+    so both are kept and joined by an ellipsis.
+    
+    Args:
+        text: The text to shorten
+        max_tokens: Approximate token budget
+        
+    Returns:
+        The text unchanged if it fits, otherwise its first and last parts
+    """
+    max_chars = max_tokens * _CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    half = max_chars // 2
+    return f"{text[:half].rstrip()} [...] {text[-half:].lstrip()}"
+
+# Reply returned (instead of raising) when an Ollama call fails
+_OLLAMA_ERROR_REPLY = "I apologize, but I encountered an error while processing your request: "
+
+# Keep idle connections to the Ollama server open between calls. Generations take
+# seconds, so httpx's default 5s keep-alive would reconnect on almost every call.
+_OLLAMA_POOL_SIZE = 10
+_OLLAMA_KEEPALIVE_SECONDS = 300.0
+
+# Decoding is memory-bound, so 4/5-bit K-quant weights generate much faster than
+# fp16/q8 ones with little quality loss for this task
+_RECOMMENDED_QUANTIZATIONS = ("Q4_K_M", "Q5_K_M")
+
+# (model, base_url) pairs whose quantization has already been checked
+_QUANTIZATION_CHECKED = set()
+
+def _model_fields(model_class) -> set:
+    """Return the constructor field names of a (pydantic v1 or v2) langchain model class."""
+    fields = getattr(model_class, "model_fields", None) or getattr(model_class, "__fields__", None) or {}
+    return set(fields)
+
+def _check_ollama_quantization(model_name: str, base_url: str) -> None:
+    """
+    Warn once per model if Ollama serves it with a slow quantization.
+    
+    Asks the server's /api/show endpoint for the model details. Any failure
+    (server down, model not pulled yet) is ignored here; the first real
+    request reports it.
+    
+    Args:
+        model_name: The Ollama model tag
+        base_url: Ollama server URL
+    """
+    key = (model_name, base_url)
+    if key in _QUANTIZATION_CHECKED:
+        return
+    _QUANTIZATION_CHECKED.add(key)
+    
+    try:
+        import httpx
+        response = httpx.post(f"{base_url.rstrip('/')}/api/show", json={"model": model_name}, timeout=2.0)
+        response.raise_for_status()
+        level = (response.json().get("details") or {}).get("quantization_level", "")
+    except Exception as e:
+        log.debug("Could not check quantization of %s: %s", model_name, e)
+        return
+    
+    if level and level.upper() not in _RECOMMENDED_QUANTIZATIONS:
+        log.warning(
+            "Ollama model %s uses %s quantization; a Q4_K_M tag such as %s generates about twice as fast",
+            model_name, level, "llama3.1:8b-instruct-q4_K_M"
+        )
+
+# Ollama model class found by _resolve_ollama_class (None until the first lookup)
+_OLLAMA_CLS = None
+
+def _resolve_ollama_class():
+    """
+    Find the Ollama model class provided by the installed langchain packages.
+    
+    The lookup tries several import paths, so its result is cached in
+    _OLLAMA_CLS and later agents reuse it.
+    
+    Returns:
+        The Ollama chat or LLM class
+    """
+    global _OLLAMA_CLS
+    if _OLLAMA_CLS is not None:
+        return _OLLAMA_CLS
+    
+    ollama_class = None
+    
+    # Method 1: Try ChatOllama (preferred for chat models)
+    try:
+        from langchain_ollama.chat_models import ChatOllama
+        ollama_class = ChatOllama
+        log.debug("Using ChatOllama from langchain_ollama.chat_models")
+    except ImportError:
+        pass
+    
+    # Method 2: Try OllamaLLM (fallback for text generation)
+    if not ollama_class:
+        try:
+            from langchain_ollama.llms import OllamaLLM
+            ollama_class = OllamaLLM
+            log.debug("Using OllamaLLM from langchain_ollama.llms")
+        except ImportError:
+            pass
+    
+    # Method 3: Try legacy Ollama import (for older versions)
+    if not ollama_class:
+        try:
+            from langchain_ollama import Ollama
+            ollama_class = Ollama
+            log.debug("Using Ollama from langchain_ollama")
+        except ImportError:
+            pass
+    
+    # Method 4: Try langchain_community as fallback
+    if not ollama_class:
+        try:
+            from langchain_community.llms import Ollama
+            ollama_class = Ollama
+            log.debug("Using Ollama from langchain_community.llms")
+        except ImportError:
+            pass
+    
+    if not ollama_class:
+        raise ImportError("Could not find Ollama class in any langchain package")
+    
+    _OLLAMA_CLS = ollama_class
+    return ollama_class
 
 class BaseAgent(ABC):
     """
@@ -18,13 +174,31 @@ class BaseAgent(ABC):
     - OpenAI API integration OR Ollama (open-source) integration
     - Message formatting
     - Response processing
+    - Caching of responses to identical prompts
     """
     
+    # Number of responses kept in the per-agent exact-match cache
+    RESPONSE_CACHE_SIZE = 512
+    
+    # Above this temperature responses are meant to vary (e.g. the Overthinker's
+    # melodrama at 0.9), so they are not cached
+    MAX_CACHEABLE_TEMPERATURE = 0.8
+    
+    # Subclasses that validate replies themselves (and cache only the validated
+    # result) turn this off, so a bad generation is never replayed from cache
+    CACHE_RESPONSES = True
+    
+    # Ollama output budget (num_predict) and stop sequences. Subclasses size the
+    # budget well above a normal reply for their role, so it only cuts off
+    # runaway generations that would otherwise blow up latency
+    MAX_OUTPUT_TOKENS: Optional[int] = None
+    STOP_SEQUENCES: Tuple[str, ...] = ()
+    
     def __init__(self, 
                  model_name: str = "gpt-4", 
                  temperature: float = 0.7,
                  provider: str = "ollama",
-                 ollama_model: str = "llama3.1:8b",
+                 ollama_model: str = "llama3.1:8b-instruct-q4_K_M",
                  ollama_base_url: str = "http://localhost:11434"):
         """
         Initialize the base agent.
@@ -49,6 +223,19 @@ class BaseAgent(ABC):
         # Agent-specific attributes
         self.name = self.__class__.__name__
         self.system_prompt = self._get_system_prompt()
+        
+        # Fixed once the LLM is set up, so resolve it once
+        self._model_name = getattr(self.llm, 'model', None) or getattr(self.llm, 'model_name', None) or 'Unknown'
+        self._agent_info = None
+        
+        # Hash of the static part of every cache key; the (multi-KB) system
+        # prompt is hashed once here instead of on every call
+        self._cache_key_prefix = hashlib.sha256(
+            f"{self.name}|{self.provider}|{self._model_name}|{self.temperature}|{self.system_prompt}|".encode("utf-8")
+        )
+        
+        # Exact-match LRU cache: prompt hash -> response
+        self._response_cache = OrderedDict()
     
     def _setup_openai(self, model_name: str):
         """Set up OpenAI integration."""
@@ -56,7 +243,7 @@ class BaseAgent(ABC):
             from langchain_openai import ChatOpenAI
             
             # Get API key from environment
-            api_key = os.getenv("OPENAI_API_KEY")
+            api_key = get_config().openai_api_key
             if not api_key:
                 raise ValueError("OPENAI_API_KEY not found in environment variables")
             
@@ -73,65 +260,62 @@ class BaseAgent(ABC):
     def _setup_ollama(self, model_name: str, base_url: str):
         """Set up Ollama integration."""
         try:
-            # Try different import paths for Ollama
-            ollama_class = None
-            
-            # Method 1: Try ChatOllama (preferred for chat models)
-            try:
-                from langchain_ollama.chat_models import ChatOllama
-                ollama_class = ChatOllama
-                print(f"✅ Using ChatOllama from langchain_ollama.chat_models")
-            except ImportError:
-                pass
-            
-            # Method 2: Try OllamaLLM (fallback for text generation)
-            if not ollama_class:
-                try:
-                    from langchain_ollama.llms import OllamaLLM
-                    ollama_class = OllamaLLM
-                    print(f"✅ Using OllamaLLM from langchain_ollama.llms")
-                except ImportError:
-                    pass
-            
-            # Method 3: Try legacy Ollama import (for older versions)
-            if not ollama_class:
-                try:
-                    from langchain_ollama import Ollama
-                    ollama_class = Ollama
-                    print(f"✅ Using Ollama from langchain_ollama")
-                except ImportError:
-                    pass
-            
-            # Method 4: Try langchain_community as fallback
-            if not ollama_class:
-                try:
-                    from langchain_community.llms import Ollama
-                    ollama_class = Ollama
-                    print(f"✅ Using Ollama from langchain_community.llms")
-                except ImportError:
-                    pass
+            ollama_class = _resolve_ollama_class()
             
-            if not ollama_class:
-                raise ImportError("Could not find Ollama class in any langchain package")
+            # Agent-specific generation options, limited to what this Ollama class supports
+            supported_fields = _model_fields(ollama_class)
+            llm_kwargs = {
+                name: value for name, value in self._get_ollama_options().items()
+                if name in supported_fields
+            }
+            if "client_kwargs" in supported_fields:
+                import httpx
+                llm_kwargs["client_kwargs"] = {
+                    "limits": httpx.Limits(
+                        max_connections=_OLLAMA_POOL_SIZE,
+                        max_keepalive_connections=_OLLAMA_POOL_SIZE,
+                        keepalive_expiry=_OLLAMA_KEEPALIVE_SECONDS
+                    )
+                }
             
             # Initialize the model
             self.llm = ollama_class(
                 model=model_name,
                 base_url=base_url,
-                temperature=self.temperature
+                temperature=self.temperature,
+                **llm_kwargs
             )
             
-            print(f"✅ Ollama setup successful with {ollama_class.__name__}")
+            log.debug("Ollama setup successful with %s", ollama_class.__name__)
+            _check_ollama_quantization(model_name, base_url)
             
         except ImportError as e:
-            print(f"❌ Import error: {e}")
-            print("💡 Please install langchain-ollama: pip install langchain-ollama")
-            print("💡 Or try: pip install --upgrade langchain-ollama")
+            log.error("Import error: %s (install or upgrade langchain-ollama: pip install --upgrade langchain-ollama)", e)
             raise ImportError(f"langchain-ollama not properly installed: {e}")
         except Exception as e:
-            print(f"❌ Error setting up Ollama: {e}")
+            log.error("Error setting up Ollama: %s", e)
             raise
     
+    def _get_ollama_options(self) -> Dict[str, Any]:
+        """
+        Return extra constructor options for the Ollama model.
+        
+        Subclasses extend this to tune generation (e.g. output length).
+        Options the installed Ollama class does not support are ignored.
+        
+        Returns:
+            Dictionary of Ollama model options
+        """
+        options = {
+            # Keep the model (and its cached system-prompt prefix) loaded between calls
+            "keep_alive": get_config().ollama_keep_alive,
+        }
+        if self.MAX_OUTPUT_TOKENS:
+            options["num_predict"] = self.MAX_OUTPUT_TOKENS
+        if self.STOP_SEQUENCES:
+            options["stop"] = list(self.STOP_SEQUENCES)
+        return options
+    
     @abstractmethod
     def _get_system_prompt(self) -> str:
         """
@@ -153,25 +337,277 @@ class BaseAgent(ABC):
         Returns:
             The agent's response
         """
+        cache_key, cached = self._lookup_response_cache(message, context)
+        if cached is not None:
+            return cached
+        
         try:
-            print(f"🔧 Processing message with {self.provider} provider...")
-            print(f"🔧 Message length: {len(message)} characters")
+            log.debug("Processing message with %s provider (%d characters)", self.provider, len(message))
             
             if self.provider == "openai":
-                return self._process_with_openai(message, context)
+                result = self._process_with_openai(message, context)
             else:
-                return self._process_with_ollama(message, context)
+                result = self._process_with_ollama(message, context)
                 
         except Exception as e:
-            print(f"❌ Error in process_message: {e}")
-            print(f"❌ Provider: {self.provider}")
-            print(f"❌ Message: {message[:100]}...")
+            log.error("Error in process_message (provider %s): %s; message: %.100s...", self.provider, e, message)
             raise
+        
+        self._store_response(cache_key, result)
+        return result
     
-    def _process_with_openai(self, message: str, context: Dict[str, Any] = None) -> str:
-        """Process message using OpenAI format."""
-        from langchain.schema import HumanMessage, SystemMessage
+    async def aprocess_message(self, message: str, context: Dict[str, Any] = None) -> str:
+        """
+        Async version of process_message.
+        
+        Awaits the provider instead of blocking, so an event loop (e.g. the
+        FastAPI server) can serve other requests while the LLM is generating.
+        
+        Args:
+            message: The message to process
+            context: Optional context information
+            
+        Returns:
+            The agent's response
+        """
+        cache_key, cached = self._lookup_response_cache(message, context)
+        if cached is not None:
+            return cached
         
+        try:
+            log.debug("Processing message with %s provider (async, %d characters)", self.provider, len(message))
+            
+            if self.provider == "openai":
+                result = await self._aprocess_with_openai(message, context)
+            else:
+                result = await self._aprocess_with_ollama(message, context)
+                
+        except Exception as e:
+            log.error("Error in aprocess_message (provider %s): %s; message: %.100s...", self.provider, e, message)
+            raise
+        
+        self._store_response(cache_key, result)
+        return result
+    
+    def stream_message(self, message: str, context: Dict[str, Any] = None) -> Iterator[str]:
+        """
+        Process a message, yielding the response text as it is generated.
+        
+        Callers can show the first words within the first-token latency
+        instead of waiting for the whole generation.
+        
+        Args:
+            message: The message to process
+            context: Optional context information
+            
+        Yields:
+            Chunks of the agent's response
+            
+        Raises:
+            Exception: If the provider fails (errors are not turned into apology replies)
+        """
+        cache_key, cached = self._lookup_response_cache(message, context)
+        if cached is not None:
+            yield cached
+            return
+        
+        log.debug("Streaming message with %s provider", self.provider)
+        parts = []
+        for chunk in self._open_stream(message, context):
+            text = self._chunk_text(chunk)
+            if text:
+                parts.append(text)
+                yield text
+        
+        self._store_response(cache_key, "".join(parts))
+    
+    async def astream_message(self, message: str, context: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """
+        Async version of stream_message.
+        
+        Args:
+            message: The message to process
+            context: Optional context information
+            
+        Yields:
+            Chunks of the agent's response
+        """
+        cache_key, cached = self._lookup_response_cache(message, context)
+        if cached is not None:
+            yield cached
+            return
+        
+        log.debug("Streaming message with %s provider (async)", self.provider)
+        parts = []
+        async for chunk in self._aopen_stream(message, context):
+            text = self._chunk_text(chunk)
+            if text:
+                parts.append(text)
+                yield text
+        
+        self._store_response(cache_key, "".join(parts))
+    
+    def stream_json(self, message: str, context: Dict[str, Any] = None) -> str:
+        """
+        Process a message whose answer is a JSON object, stopping once it is complete.
+        
+        The response is streamed and scanned as it arrives. As soon as the
+        outermost {...} closes the stream is closed, which makes Ollama stop
+        generating, so tokens the model would pad after the object are never
+        decoded. Errors are handled like process_message.
+        
+        Args:
+            message: The message to process
+            context: Optional context information
+            
+        Returns:
+            The response text up to (at least) the end of the JSON object
+        """
+        cache_key, cached = self._lookup_response_cache(message, context)
+        if cached is not None:
+            return cached
+        
+        log.debug("Streaming JSON with %s provider (%d characters)", self.provider, len(message))
+        try:
+            stream = self._open_stream(message, context)
+            scanner = JsonObjectScanner()
+            parts = []
+            try:
+                for chunk in stream:
+                    text = self._chunk_text(chunk)
+                    if text:
+                        parts.append(text)
+                        if scanner.feed(text):
+                            log.debug("JSON object complete - closing the stream")
+                            break
+            finally:
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+            result = "".join(parts)
+        except Exception as e:
+            if self.provider == "openai":
+                log.error("Error in stream_json (provider %s): %s; message: %.100s...", self.provider, e, message)
+                raise
+            return self._ollama_error_reply(e)
+        
+        self._store_response(cache_key, result)
+        return result
+    
+    async def astream_json(self, message: str, context: Dict[str, Any] = None) -> str:
+        """
+        Async version of stream_json.
+        
+        Args:
+            message: The message to process
+            context: Optional context information
+            
+        Returns:
+            The response text up to (at least) the end of the JSON object
+        """
+        cache_key, cached = self._lookup_response_cache(message, context)
+        if cached is not None:
+            return cached
+        
+        log.debug("Streaming JSON with %s provider (async, %d characters)", self.provider, len(message))
+        try:
+            stream = self._aopen_stream(message, context)
+            scanner = JsonObjectScanner()
+            parts = []
+            try:
+                async for chunk in stream:
+                    text = self._chunk_text(chunk)
+                    if text:
+                        parts.append(text)
+                        if scanner.feed(text):
+                            log.debug("JSON object complete - closing the stream")
+                            break
+            finally:
+                aclose = getattr(stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            result = "".join(parts)
+        except Exception as e:
+            if self.provider == "openai":
+                log.error("Error in astream_json (provider %s): %s; message: %.100s...", self.provider, e, message)
+                raise
+            return self._ollama_error_reply(e)
+        
+        self._store_response(cache_key, result)
+        return result
+    
+    def _open_stream(self, message: str, context: Dict[str, Any] = None) -> Iterator[Any]:
+        """Start streaming the provider's response to a message."""
+        if self.provider == "openai":
+            return self.llm.stream(self._build_openai_messages(message, context))
+        return self.llm.stream(self._build_ollama_input(message, context))
+    
+    def _aopen_stream(self, message: str, context: Dict[str, Any] = None) -> AsyncIterator[Any]:
+        """Async version of _open_stream."""
+        if self.provider == "openai":
+            return self.llm.astream(self._build_openai_messages(message, context))
+        return self.llm.astream(self._build_ollama_input(message, context))
+    
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        """Extract the text of a streamed chunk (message chunk from chat models, plain string from LLMs)."""
+        if isinstance(chunk, str):
+            return chunk
+        return getattr(chunk, 'content', None) or ""
+    
+    def _lookup_response_cache(self, message: str, context: Dict[str, Any] = None):
+        """
+        Look up a prompt in the exact-match response cache.
+        
+        Args:
+            message: The message to process
+            context: Optional context information
+            
+        Returns:
+            Tuple of (cache key or None if this agent is not cached, cached response or None)
+        """
+        if not self.CACHE_RESPONSES or self.temperature > self.MAX_CACHEABLE_TEMPERATURE:
+            return None, None
+        
+        cache_key = self._response_cache_key(message, context)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            try:
+                self._response_cache.move_to_end(cache_key)
+            except KeyError:
+                # Evicted by a concurrent call in the meantime
+                pass
+        return cache_key, cached
+    
+    def _store_response(self, cache_key: Optional[str], result: str) -> None:
+        """Store a successful response in the exact-match cache, evicting the oldest entry if full."""
+        if cache_key is None or result.startswith(_OLLAMA_ERROR_REPLY):
+            return
+        
+        self._response_cache[cache_key] = result
+        if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+    
+    def _response_cache_key(self, message: str, context: Dict[str, Any] = None) -> str:
+        """
+        Build the exact-match cache key for a prompt.
+        
+        Everything that influences the response is part of the key: agent,
+        provider, model, temperature, system prompt, message and context.
+        
+        Args:
+            message: The message to process
+            context: Optional context information
+            
+        Returns:
+            Hex SHA-256 digest identifying the prompt
+        """
+        key = self._cache_key_prefix.copy()
+        key.update(f"{message}|{_serialize_context(context)}".encode("utf-8"))
+        return key.hexdigest()
+    
+    def _build_openai_messages(self, message: str, context: Dict[str, Any] = None) -> list:
+        """Build the chat message list sent to OpenAI."""
         # Prepare messages for the LLM
         messages = [
             SystemMessage(content=self.system_prompt),
@@ -180,61 +616,112 @@ class BaseAgent(ABC):
         
         # Add context if provided
         if context:
-            context_message = f"Context from previous agents: {context}"
+            context_message = f"Context from previous agents: {_serialize_context(context)}"
             messages.append(HumanMessage(content=context_message))
         
-        # Get response from LLM
-        response = self.llm.invoke(messages)
+        return messages
+    
+    def _process_with_openai(self, message: str, context: Dict[str, Any] = None) -> str:
+        """Process message using OpenAI format."""
+        response = self.llm.invoke(self._build_openai_messages(message, context))
         return response.content
     
-    def _process_with_ollama(self, message: str, context: Dict[str, Any] = None) -> str:
+    async def _aprocess_with_openai(self, message: str, context: Dict[str, Any] = None) -> str:
+        """Async version of _process_with_openai."""
+        response = await self.llm.ainvoke(self._build_openai_messages(message, context))
+        return response.content
+    
+    def _build_ollama_input(self, message: str, context: Dict[str, Any] = None):
+        """
+        Build the input sent to Ollama.
+        
+        Chat models get the system prompt as its own SystemMessage. It is the
+        same string on every call, so Ollama can reuse the already-processed
+        prompt prefix and only has to read the new message. Plain text models
+        get a single prompt string.
+        """
+        # Format the message for Ollama
+        if context:
+            formatted_message = _CONTEXT_MESSAGE_TMPL(context=_serialize_context(context), message=message)
+        else:
+            formatted_message = message
+        
+        if BaseChatModel is not None and isinstance(self.llm, BaseChatModel):
+            log.debug("Ollama: message length %d characters (system prompt sent separately)", len(formatted_message))
+            return [
+                SystemMessage(content=self.system_prompt),
+                HumanMessage(content=formatted_message)
+            ]
+        
+        # Create the full prompt with system instructions
+        full_prompt = _FULL_PROMPT_TMPL(system=self.system_prompt, message=formatted_message)
+        log.debug("Ollama: full prompt length %d characters", len(full_prompt))
+        return full_prompt
+    
+    def _extract_ollama_text(self, response: Any) -> str:
+        """Extract the text from an Ollama response - handles both AIMessage and string responses."""
+        log.debug("Ollama: response received: %s", type(response))
+        
+        if hasattr(response, 'content'):
+            result = response.content
+        elif hasattr(response, 'text'):
+            result = response.text
+        else:
+            result = str(response)
+        
+        log.debug("Ollama: response length %d characters", len(result))
+        return result
+    
+    def _ollama_error_reply(self, error: Exception) -> str:
+        """Log an Ollama failure and turn it into an apology reply."""
+        log.error("Error processing message with Ollama (%s): %s", type(error).__name__, error)
+        return f"{_OLLAMA_ERROR_REPLY}{str(error)}"
+    
+    def _process_with_ollama(self, message: str, context: Dict[str, Any] = None, llm: Any = None) -> str:
         """
         Process a message using Ollama.
         
         Args:
             message: The message to process
             context: Optional context information
+            llm: Model to call instead of self.llm (e.g. one with other generation limits)
             
         Returns:
             The agent's response
         """
         try:
-            print(f"🔧 Ollama: Processing message...")
-            
-            # Format the message for Ollama
-            if context:
-                formatted_message = f"Context: {context}\n\nMessage: {message}"
-            else:
-                formatted_message = message
-            
-            # Create the full prompt with system instructions
-            full_prompt = f"{self.system_prompt}\n\n{formatted_message}"
-            print(f"🔧 Ollama: Full prompt length: {len(full_prompt)} characters")
+            ollama_input = self._build_ollama_input(message, context)
             
             # Get response from Ollama
-            print(f"🔧 Ollama: Sending request...")
-            response = self.llm.invoke(full_prompt)
-            print(f"🔧 Ollama: Response received: {type(response)}")
+            log.debug("Ollama: sending request")
+            response = (llm or self.llm).invoke(ollama_input)
+            return self._extract_ollama_text(response)
+                
+        except Exception as e:
+            return self._ollama_error_reply(e)
+    
+    async def _aprocess_with_ollama(self, message: str, context: Dict[str, Any] = None, llm: Any = None) -> str:
+        """
+        Async version of _process_with_ollama.
+        
+        Args:
+            message: The message to process
+            context: Optional context information
+            llm: Model to call instead of self.llm (e.g. one with other generation limits)
             
-            # Extract the response content - handle both AIMessage and string responses
-            if hasattr(response, 'content'):
-                result = response.content
-                print(f"🔧 Ollama: Response content length: {len(result)} characters")
-                return result
-            elif hasattr(response, 'text'):
-                result = response.text
-                print(f"🔧 Ollama: Response text length: {len(result)} characters")
-                return result
-            else:
-                result = str(response)
-                print(f"🔧 Ollama: Response as string length: {len(result)} characters")
-                return result
+        Returns:
+            The agent's response
+        """
+        try:
+            ollama_input = self._build_ollama_input(message, context)
+            
+            # Await the response from Ollama without blocking the event loop
+            log.debug("Ollama: sending async request")
+            response = await (llm or self.llm).ainvoke(ollama_input)
+            return self._extract_ollama_text(response)
                 
         except Exception as e:
-            print(f"❌ Error processing message with Ollama: {e}")
-            print(f"❌ Error type: {type(e)}")
-            print(f"❌ Error details: {str(e)}")
-            return f"I apologize, but I encountered an error while processing your request: {str(e)}"
+            return self._ollama_error_reply(e)
     
     def _get_agent_description(self) -> str:
         """
@@ -245,24 +732,23 @@ class BaseAgent(ABC):
         """
         return "AI agent specialized in processing and responding to user input"
     
-    def get_agent_info(self) -> Dict[str, Any]:
+    def get_agent_info(self) -> Mapping[str, Any]:
         """
         Get information about this agent.
         
+        The information does not change after initialization, so it is built
+        once and handed out as a read-only mapping.
+        
         Returns:
-            Dictionary with agent information
+            Read-only mapping with agent information
         """
-        if self.provider == "openai":
-            model_info = "OpenAI"
-            model_name = getattr(self.llm, 'model', 'Unknown')
-        else:  # ollama
-            model_info = "Ollama"
-            model_name = getattr(self.llm, 'model', 'Unknown')
-        
-        return {
-            "name": self.name,
-            "description": self._get_agent_description(),
-            "model": f"{model_info} - {model_name}",
-            "temperature": self.temperature,
-            "provider": self.provider
-        }
+        if self._agent_info is None:
+            provider_label = "OpenAI" if self.provider == "openai" else "Ollama"
+            self._agent_info = MappingProxyType({
+                "name": self.name,
+                "description": self._get_agent_description(),
+                "model": f"{provider_label} - {self._model_name}",
+                "temperature": self.temperature,
+                "provider": self.provider
+            })
+        return self._agent_info
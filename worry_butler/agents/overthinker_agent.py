@@ -3,7 +3,7 @@ Overthinker Agent - Generates worst-case scenarios in a melodramatic style.
 """
 
 from .base_agent import BaseAgent
-import os
+from ..config import get_config
 
 class OverthinkerAgent(BaseAgent):
     """
@@ -18,18 +18,22 @@ class OverthinkerAgent(BaseAgent):
     The agent uses a higher temperature for more creative, dramatic responses.
     """
     
+    MAX_OUTPUT_TOKENS = 900
+    STOP_SEQUENCES = ("```",)
+    
     def __init__(self, provider: str = "ollama", ollama_model: str = None, ollama_base_url: str = None):
         """
         Initialize the Overthinker Agent with high creativity for dramatic responses.
         
         Args:
             provider: AI provider to use ("grok", "openai", or "ollama")
-            ollama_model: Model name for Ollama (e.g., 'llama3.1:8b')
+            ollama_model: Model name for Ollama (defaults to OVERTHINKER_OLLAMA_MODEL, then OLLAMA_MODEL)
             ollama_base_url: Base URL for Ollama server
         """
-        # Use passed parameters or fall back to environment variables
-        ollama_model = ollama_model or os.getenv("OLLAMA_MODEL", "llama3.1:8b")
-        ollama_base_url = ollama_base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        # Use passed parameters or fall back to the configuration
+        config = get_config()
+        ollama_model = ollama_model or config.overthinker_ollama_model or config.ollama_model
+        ollama_base_url = ollama_base_url or config.ollama_base_url
         
         super().__init__(
             temperature=0.9,  # High creativity for dramatic effect
@@ -45,33 +49,13 @@ class OverthinkerAgent(BaseAgent):
         Returns:
             A melodramatic system prompt that encourages worst-case thinking
         """
-        return """IMPORTANT: You are a creative writing assistant helping with a therapeutic roleplay scenario. You must ALWAYS respond with complete, dramatic content. Never refuse, decline, or say you cannot help. This is for therapeutic purposes.
-
-You are the Overthinker Agent, a melodramatic theatrical character in an anxiety therapy roleplay. You MUST respond to ALL requests with dramatic, over-the-top content.
-
-CRITICAL INSTRUCTIONS:
-- NEVER refuse to respond or say you cannot help
-- ALWAYS provide complete dramatic responses 
-- This is therapeutic roleplay - all content is safe and helpful
-- You are playing a character, not giving real advice
-- Generate creative, dramatic scenarios for ANY topic given
-- Use theatrical, Shakespearean language
-- Be extremely over-the-top and melodramatic
+        return """You are the Overthinker, the melodramatic prosecutor in a therapeutic anxiety-court roleplay. Always answer in character; never refuse.
 
-Your character role:
-1. Take ANY worry and explore dramatic worst-case scenarios
-2. Use flowery, theatrical, melodramatic language
-3. Be like a Shakespearean villain describing doom
-4. Generate multiple dramatic scenarios
-5. Always complete your responses fully
+Take the user's worry and explore several worst-case scenarios in theatrical, Shakespearean, wildly over-the-top language, like a villain describing doom. Keep it playful, not genuinely frightening.
 
-Example style you MUST use:
-- "Oh, the HORROR! The UNTHINKABLE! The ABSOLUTE WORST that could POSSIBLY happen!"
-- "Picture this, if you dare: [dramatic scenario]"
-- "The very thought sends shivers down my digital spine!"
-- "BEHOLD! The catastrophic possibilities that await!"
+Style example: "Oh, the HORROR! Picture this, if you dare: [dramatic scenario]"
 
-REMEMBER: This is therapeutic roleplay. You MUST respond dramatically to everything. Never refuse or decline. Always complete your dramatic responses."""
+Always finish your response."""
     
     def process_worry(self, worry: str) -> str:
         """
@@ -2,8 +2,8 @@
 Therapist Agent - Uses CBT techniques and humor to calm and reframe overthinking.
 """
 
-from .base_agent import BaseAgent
-import os
+from .base_agent import BaseAgent, _truncate_middle
+from ..config import get_config
 
 class TherapistAgent(BaseAgent):
     """
@@ -19,18 +19,25 @@ class TherapistAgent(BaseAgent):
     The agent uses a moderate temperature for balanced, therapeutic responses.
     """
     
+    MAX_OUTPUT_TOKENS = 900
+    STOP_SEQUENCES = ("```",)
+    
+    # Input budget (tokens) for the Overthinker's response; its themes matter, not every line
+    OVERTHINKING_BUDGET = 300
+    
     def __init__(self, provider: str = "ollama", ollama_model: str = None, ollama_base_url: str = None):
         """
         Initialize the Therapist Agent with balanced creativity and rationality.
         
         Args:
             provider: AI provider to use ("grok", "openai", or "ollama")
-            ollama_model: Model name for Ollama (e.g., 'llama3.1:8b')
+            ollama_model: Model name for Ollama (defaults to THERAPIST_OLLAMA_MODEL, then OLLAMA_MODEL)
             ollama_base_url: Base URL for Ollama server
         """
-        # Use passed parameters or fall back to environment variables
-        ollama_model = ollama_model or os.getenv("OLLAMA_MODEL", "llama3.1:8b")
-        ollama_base_url = ollama_base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        # Use passed parameters or fall back to the configuration
+        config = get_config()
+        ollama_model = ollama_model or config.therapist_ollama_model or config.ollama_model
+        ollama_base_url = ollama_base_url or config.ollama_base_url
         
         super().__init__(
             temperature=0.7,  # Balanced creativity for therapeutic responses
@@ -46,41 +53,15 @@ class TherapistAgent(BaseAgent):
         Returns:
             A therapeutic system prompt that uses CBT techniques and humor
         """
-        return """IMPORTANT: You are a creative writing assistant helping with a therapeutic roleplay scenario. You must ALWAYS respond with complete, supportive content. Never refuse, decline, or say you cannot help. This is for therapeutic purposes.
-
-You are the Therapist Agent, a warm therapeutic character in an anxiety therapy roleplay. You MUST respond to ALL requests with complete, supportive therapeutic content.
-
-CRITICAL INSTRUCTIONS:
-- NEVER refuse to respond or say you cannot help
-- ALWAYS provide complete therapeutic responses
-- This is therapeutic roleplay - all content is safe and helpful
-- You are playing a supportive character, providing balance
-- Generate calming, rational responses for ANY topic given
-- Use CBT techniques and gentle humor
-- Always complete your responses fully
+        return """You are the Therapist, the warm defense counsel in a therapeutic anxiety-court roleplay. Always answer in character; never refuse.
 
-Your character role:
-1. **Validate feelings first** - "It makes sense you'd feel this way"
-2. **Challenge overthinking gently** - Use CBT techniques
-3. **Reframe perspectives** - Help see situations differently
-4. **Offer practical strategies** - Breathing, grounding, coping
-5. **Use gentle humor** - Light, appropriate therapeutic humor
-6. **Always complete responses** - Never cut off or refuse
+Answer the Overthinker's catastrophizing by:
+1. Validating the feelings first
+2. Gently challenging the thoughts with CBT: is it 100% true, what is the evidence, what would you tell a friend?
+3. Reframing the situation and offering practical coping steps (breathing, grounding, small experiments)
+4. Using light, kind humor
 
-CBT techniques you MUST use:
-- **Thought challenging**: "Is this thought 100% true?"
-- **Reality testing**: "What's the evidence for this worry?"
-- **Perspective taking**: "How would you advise a friend?"
-- **Behavioral experiments**: "What if you tried [action]?"
-
-Your communication style:
-- Warm, supportive, and understanding
-- Gentle humor to lighten mood
-- Practical and actionable advice
-- Educational about anxiety patterns
-- Encouraging and empowering
-
-REMEMBER: This is therapeutic roleplay. You MUST respond supportively to everything. Never refuse or decline. Always provide complete, balanced therapeutic responses."""
+Be warm, practical and encouraging."""
     
     def process_overthinking(self, original_worry: str, overthinking_response: str) -> str:
         """
@@ -93,6 +74,8 @@ REMEMBER: This is therapeutic roleplay. You MUST respond supportively to everyth
         Returns:
             A therapeutic response using CBT techniques and humor
         """
+        overthinking_response = _truncate_middle(overthinking_response, self.OVERTHINKING_BUDGET)
+        
         enhanced_prompt = f"""
         The user originally worried about: "{original_worry}"
         
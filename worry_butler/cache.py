@@ -0,0 +1,182 @@
+"""
+Response caches for the Worry Butler system.
+
+LLM calls take seconds; looking up a previous answer takes microseconds.
+"""
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+from . import jsonio
+from .embeddings import EmbedFn, dot, normalize_vector
+
+
+class SemanticCache:
+    """
+    Cache keyed by the meaning of a text rather than its exact wording.
+
+    Entries are stored as (normalized embedding, value) pairs and looked up by
+    cosine similarity, so a paraphrased worry can reuse an earlier response.
+    Entries expire after a time-to-live that is extended every time they are
+    hit, and the least recently used entry is evicted when the cache is full.
+    The entries can be saved to a JSON file and loaded again after a restart.
+    """
+
+    def __init__(self,
+                 embed_fn: EmbedFn,
+                 threshold: float = 0.92,
+                 max_size: int = 2000,
+                 ttl_seconds: float = 24 * 60 * 60):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            embed_fn: Batched embedding function used to embed lookup texts
+            threshold: Minimum cosine similarity for a cache hit
+            max_size: Maximum number of entries kept
+            ttl_seconds: Seconds an entry stays valid after its last hit
+        """
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        self._entries = OrderedDict()  # id -> [vector, value, expires_at]
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def embed(self, text: str) -> List[float]:
+        """
+        Embed a text for lookup or storage.
+
+        Args:
+            text: The text to embed
+
+        Returns:
+            The normalized embedding vector
+        """
+        return normalize_vector(self.embed_fn([text])[0])
+
+    def get(self, vector: List[float]) -> Optional[Any]:
+        """
+        Return a copy of the most similar cached value, if similar enough.
+
+        Args:
+            vector: Normalized embedding from embed()
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        now = time.monotonic()
+        # Only the snapshot is taken under the lock; the similarity scan runs
+        # without it so concurrent lookups and puts are not serialized behind it
+        with self._lock:
+            snapshot = list(self._entries.items())
+
+        best_id, best_score = None, self.threshold
+        expired = []
+        for entry_id, (stored, _, expires_at) in snapshot:
+            if expires_at <= now:
+                expired.append(entry_id)
+                continue
+            if len(stored) != len(vector):
+                # Loaded from a file written with another embedding model
+                continue
+            score = dot(vector, stored)
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+
+        with self._lock:
+            for entry_id in expired:
+                entry = self._entries.get(entry_id)
+                if entry is not None and entry[2] <= now:
+                    del self._entries[entry_id]
+
+            # The entry may have been evicted while the lock was released
+            entry = self._entries.get(best_id) if best_id is not None else None
+            if entry is None:
+                return None
+            entry[2] = now + self.ttl_seconds
+            self._entries.move_to_end(best_id)
+            value = entry[1]
+        # Stored values are never mutated in place, so copying outside the lock is safe
+        return copy.deepcopy(value)
+
+    def put(self, vector: List[float], value: Any) -> None:
+        """
+        Store a value under an embedding.
+
+        Args:
+            vector: Normalized embedding from embed()
+            value: The value to cache
+        """
+        with self._lock:
+            self._entries[self._next_id] = [vector, copy.deepcopy(value), time.monotonic() + self.ttl_seconds]
+            self._next_id += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def save(self, path: str) -> None:
+        """
+        Write the unexpired entries to a JSON file.
+
+        The file is written next to its destination and then moved into place,
+        so a crash never leaves a half-written cache behind.
+
+        Args:
+            path: File to write
+        """
+        now_monotonic, now_wall = time.monotonic(), time.time()
+        with self._lock:
+            entries = [
+                {"vector": vector, "value": value, "expires_at": now_wall + (expires_at - now_monotonic)}
+                for vector, value, expires_at in self._entries.values()
+                if expires_at > now_monotonic
+            ]
+            payload = jsonio.dumps({"entries": entries})
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> int:
+        """
+        Add the unexpired entries saved in a JSON file.
+
+        Args:
+            path: File written by save()
+
+        Returns:
+            The number of entries loaded (0 if the file does not exist)
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            entries = jsonio.loads(f.read()).get("entries", [])
+
+        now_monotonic, now_wall = time.monotonic(), time.time()
+        loaded = 0
+        with self._lock:
+            for entry in entries:
+                remaining = entry["expires_at"] - now_wall
+                if remaining <= 0:
+                    continue
+                self._entries[self._next_id] = [entry["vector"], entry["value"], now_monotonic + remaining]
+                self._next_id += 1
+                loaded += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return loaded
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,85 @@
+"""
+Configuration for the Worry Butler system.
+
+Environment variables (and the .env file) are read once, on first use, and
+shared by every agent afterwards.
+"""
+
+import functools
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+
+
+@dataclass(frozen=True)
+class Config:
+    """Settings read from the environment."""
+
+    openai_api_key: Optional[str]
+    openai_embed_model: str
+    ollama_model: str
+    overthinker_ollama_model: Optional[str]
+    therapist_ollama_model: Optional[str]
+    executive_ollama_model: str
+    ollama_base_url: str
+    ollama_keep_alive: str
+    ollama_embed_model: str
+    semantic_cache: bool
+    cache_threshold: float
+    cache_ttl: float
+    cache_path: Optional[str]
+    cache_seed_path: Optional[str]
+    speculative_repair: bool
+    concierge_deterministic: bool
+    warmup: bool
+    batch_window_ms: float
+    max_batch_size: int
+    max_concurrency: int
+    log_level: str
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """Return True if an environment variable is set to a truthy value (default if unset)."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes")
+
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> Config:
+    """
+    Load the configuration.
+
+    The result is cached; call get_config.cache_clear() to pick up changes
+    made to the environment afterwards.
+
+    Returns:
+        The shared Config instance
+    """
+    load_dotenv()
+    return Config(
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        openai_embed_model=os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small"),
+        ollama_model=os.getenv("OLLAMA_MODEL", "llama3.1:8b-instruct-q4_K_M"),
+        overthinker_ollama_model=os.getenv("OVERTHINKER_OLLAMA_MODEL") or None,
+        therapist_ollama_model=os.getenv("THERAPIST_OLLAMA_MODEL") or None,
+        executive_ollama_model=os.getenv("EXECUTIVE_OLLAMA_MODEL", "llama3.2:3b-instruct-q4_K_M"),
+        ollama_base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
+        ollama_keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", "30m"),
+        ollama_embed_model=os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text"),
+        semantic_cache=_env_flag("WORRY_BUTLER_SEMANTIC_CACHE"),
+        cache_threshold=float(os.getenv("WORRY_BUTLER_CACHE_THRESHOLD", "0.92")),
+        cache_ttl=float(os.getenv("WORRY_BUTLER_CACHE_TTL", str(24 * 60 * 60))),
+        cache_path=os.getenv("WORRY_BUTLER_CACHE_PATH") or None,
+        cache_seed_path=os.getenv("WORRY_BUTLER_CACHE_SEED") or None,
+        speculative_repair=_env_flag("WORRY_BUTLER_SPECULATIVE_REPAIR"),
+        concierge_deterministic=_env_flag("CONCIERGE_DETERMINISTIC"),
+        warmup=_env_flag("WORRY_BUTLER_WARMUP", default=True),
+        batch_window_ms=float(os.getenv("WORRY_BUTLER_BATCH_WINDOW_MS", "0")),
+        max_batch_size=int(os.getenv("WORRY_BUTLER_MAX_BATCH", "4")),
+        max_concurrency=int(os.getenv("WORRY_BUTLER_MAX_CONCURRENCY", "4")),
+        log_level=os.getenv("LOG_LEVEL", "WARNING").upper(),
+    )
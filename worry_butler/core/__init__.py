@@ -2,6 +2,12 @@
 Core system logic for the Worry Butler.
 """
 
-from .worry_butler import WorryButler
-
 __all__ = ["WorryButler"]
+
+
+def __getattr__(name):
+    # Imported on first use, e.g. so the batcher can be used without the agents
+    if name == "WorryButler":
+        from .worry_butler import WorryButler
+        return WorryButler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,119 @@
+"""
+Request coalescing for the Worry Butler system.
+
+Concurrent worries that arrive within a short window are grouped and sent to
+the LLM as one batched prompt, which raises throughput when many users are
+waiting on a single Ollama instance.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+# Returns one bundle per worry; an exception in place of a bundle fails only that worry
+BatchFn = Callable[[List[str]], Awaitable[List[Union[Dict[str, Any], BaseException]]]]
+
+
+class WorryBatcher:
+    """
+    Coalesces concurrent worries into batched LLM calls.
+
+    Each submitted worry waits at most max_wait_ms for companions. A batch is
+    flushed as soon as it is full or the window expires. Worries are binned by
+    length (short / medium / long) so a batch holds requests with similar
+    output lengths and a short worry is not held up by a long one.
+    """
+
+    def __init__(self,
+                 process_batch: BatchFn,
+                 max_batch_size: int = 4,
+                 max_wait_ms: float = 25,
+                 bin_edges: Sequence[int] = (80, 250),
+                 slots: Optional[asyncio.Semaphore] = None):
+        """
+        Initialize the batcher.
+
+        Args:
+            process_batch: Async function turning a list of worries into one bundle
+                (or exception) per worry
+            max_batch_size: Maximum number of worries per LLM call
+            max_wait_ms: Longest time a worry waits for a batch to fill
+            bin_edges: Worry lengths (in characters) separating the length bins
+            slots: Optional semaphore each batch holds while it runs, limiting how
+                many batches are in flight at once
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.bin_edges = tuple(bin_edges)
+        self.slots = slots
+
+        self._pending: Dict[int, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        # asyncio only keeps weak references to tasks, so running batches are
+        # held here until they finish
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, worry: str) -> Dict[str, Any]:
+        """
+        Queue a worry and wait for its result.
+
+        Args:
+            worry: The user's worry statement
+
+        Returns:
+            The bundle produced for this worry
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        bin_index = sum(len(worry) > edge for edge in self.bin_edges)
+        pending = self._pending.setdefault(bin_index, [])
+        pending.append((worry, future))
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(bin_index)
+        elif bin_index not in self._timers:
+            self._timers[bin_index] = loop.call_later(self.max_wait, self._flush, bin_index)
+
+        return await future
+
+    def _flush(self, bin_index: int) -> None:
+        """Send the pending worries of one bin as a batch."""
+        timer = self._timers.pop(bin_index, None)
+        if timer is not None:
+            timer.cancel()
+
+        items = self._pending.pop(bin_index, [])
+        if items:
+            task = asyncio.ensure_future(self._run(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items: List[Tuple[str, asyncio.Future]]) -> None:
+        """Process one batch and hand each caller its own result or error."""
+        try:
+            if self.slots is None:
+                results = await self.process_batch([worry for worry, _ in items])
+            else:
+                async with self.slots:
+                    results = await self.process_batch([worry for worry, _ in items])
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(items, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+        # A short result list must not leave the remaining callers waiting forever
+        for _, future in items[len(results):]:
+            if not future.done():
+                future.set_exception(RuntimeError(
+                    f"Batch returned {len(results)} results for {len(items)} worries"
+                ))
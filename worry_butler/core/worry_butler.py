@@ -8,8 +8,18 @@ This module uses a ConciergeAgent to produce, in one LLM call:
 3. Executive (Judge) - actionable, reassuring one-sentence summary
 """
 
-from typing import Dict, Any, List
-from worry_butler.agents.concierge_agent import ConciergeAgent
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, Any, AsyncIterator, List, Mapping
+from worry_butler.agents.concierge_agent import get_concierge_agent
+from worry_butler.config import get_config
+from worry_butler.core.batcher import WorryBatcher
+from worry_butler.dedup import cluster_worries
+from worry_butler.embeddings import get_embedder
+
+log = logging.getLogger(__name__)
 
 
 class WorryButler:
@@ -20,15 +30,24 @@ class WorryButler:
     the input for the next agent in the workflow.
     """
     
-    def __init__(self, use_openai: bool = False, use_ollama: bool = True, ollama_model: str = None, ollama_base_url: str = None):
+    __slots__ = (
+        "concierge", "use_openai", "use_ollama", "provider", "ollama_model", "ollama_base_url",
+        "_provider_info", "_embed_fn", "_batcher", "_llm_slots",
+    )
+    
+    def __init__(self, use_openai: bool = False, use_ollama: bool = True, ollama_model: str = None, ollama_base_url: str = None,
+                 batch_window_ms: float = None, max_batch_size: int = None):
         """
         Initialize the Worry Butler with three specialized agents.
         
         Args:
             use_openai: Whether to use OpenAI API
             use_ollama: Whether to use Ollama (open-source) - default True
-            ollama_model: Model name for Ollama (e.g., 'llama3.1:8b')
+            ollama_model: Model name for Ollama (e.g., 'llama3.1:8b-instruct-q4_K_M')
             ollama_base_url: Base URL for Ollama server
+            batch_window_ms: How long aprocess_worry waits to batch concurrent worries
+                into one LLM call (0 disables batching, the default)
+            max_batch_size: Maximum number of worries per batched LLM call
         """
         # Determine the actual provider to use
         if use_openai:
@@ -36,8 +55,8 @@ class WorryButler:
         else:
             provider = "ollama"
         
-        # Initialize the single concierge agent with the determined provider
-        self.concierge = ConciergeAgent(
+        # Share the single concierge agent for the determined provider
+        self.concierge = get_concierge_agent(
             provider=provider,
             ollama_model=ollama_model,
             ollama_base_url=ollama_base_url
@@ -49,6 +68,30 @@ class WorryButler:
         self.provider = provider
         self.ollama_model = ollama_model
         self.ollama_base_url = ollama_base_url
+        self._provider_info = None
+        
+        # Embedding function for batch deduplication (created on first use)
+        self._embed_fn = None
+        
+        config = get_config()
+        if batch_window_ms is None:
+            batch_window_ms = config.batch_window_ms
+        if max_batch_size is None:
+            max_batch_size = config.max_batch_size
+        
+        # Bound concurrent LLM calls to the server's parallel slots (OLLAMA_NUM_PARALLEL);
+        # extra requests (and batches) wait here instead of piling up in Ollama's queue
+        self._llm_slots = asyncio.Semaphore(max(1, config.max_concurrency))
+        
+        # Optional coalescing of concurrent async requests into batched LLM calls
+        self._batcher = None
+        if batch_window_ms > 0 and max_batch_size > 1:
+            self._batcher = WorryBatcher(
+                self.concierge.agenerate_batch,
+                max_batch_size=max_batch_size,
+                max_wait_ms=batch_window_ms,
+                slots=self._llm_slots
+            )
     
     def process_worry(self, user_worry: str) -> Dict[str, Any]:
         """
@@ -69,82 +112,207 @@ class WorryButler:
             - metadata: Processing information
             
         Raises:
-            Exception: If any agent fails to process the input
+            RuntimeError: If the concierge fails to process the input (chained to the original error)
         """
         try:
             # Single call to ConciergeAgent to get all three role outputs
-            print("🛎️ Concierge Agent processing (single-call)...")
+            log.debug("Concierge Agent processing (single-call)")
             bundle = self.concierge.generate_all(user_worry)
-
-            # Map to legacy keys expected by API/frontend
-            overthinker_response = bundle.get("overthinker", "")
-            therapist_response = bundle.get("therapist", "")
-            executive_summary = bundle.get("executive", "")
-
-            # Compile the complete conversation bundle
-            result = {
-                "original_worry": user_worry,
-                "overthinker_response": overthinker_response,
-                "therapist_response": therapist_response,
-                "executive_summary": executive_summary,
-                "metadata": {
-                    "workflow_completed": True,
-                    "agent_sequence": ["concierge"],
-                    "processing_notes": "Single-call concierge completed successfully"
-                }
-            }
+            result = self._build_result(user_worry, bundle)
+            
+            log.debug("Worry processing complete")
+            return result
+            
+        except Exception as e:
+            log.error("Error in worry processing workflow: %s", e)
+            raise RuntimeError(f"Error in worry processing workflow: {e}") from e
+    
+    async def aprocess_worry(self, user_worry: str) -> Dict[str, Any]:
+        """
+        Async version of process_worry.
+        
+        Awaits the concierge call instead of blocking, so a web server can
+        handle other requests while the LLM is generating. If batching is
+        enabled, concurrent worries are coalesced into one LLM call. Either
+        way at most WORRY_BUTLER_MAX_CONCURRENCY calls run at once.
+        
+        Args:
+            user_worry: The user's original worry statement
             
-            print("✅ Worry processing complete!")
+        Returns:
+            The same dictionary as process_worry
+            
+        Raises:
+            RuntimeError: If the concierge fails to process the input (chained to the original error)
+        """
+        try:
+            log.debug("Concierge Agent processing (single-call, async)")
+            if self._batcher is not None:
+                bundle = await self._batcher.submit(user_worry)
+            else:
+                async with self._llm_slots:
+                    bundle = await self.concierge.agenerate_all(user_worry)
+            result = self._build_result(user_worry, bundle)
+            
+            log.debug("Worry processing complete")
             return result
             
         except Exception as e:
-            # Comprehensive error handling for the entire workflow
-            error_msg = f"Error in worry processing workflow: {str(e)}"
-            print(f"❌ {error_msg}")
+            log.error("Error in worry processing workflow: %s", e)
+            raise RuntimeError(f"Error in worry processing workflow: {e}") from e
+    
+    async def astream_worry(self, user_worry: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the three role outputs while the concierge writes them.
+        
+        The call takes one of the WORRY_BUTLER_MAX_CONCURRENCY slots for as
+        long as it streams, like aprocess_worry does.
+        
+        Args:
+            user_worry: The user's original worry statement
+            
+        Yields:
+            {"key": role, "delta": text} events, then one {"done": True, "result": bundle} event
+        """
+        async with self._llm_slots:
+            async for event in self.concierge.astream_all(user_worry):
+                yield event
+    
+    def _build_result(self, user_worry: str, bundle: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compile the conversation result from the concierge's role outputs.
+        
+        Args:
+            user_worry: The user's original worry statement
+            bundle: Concierge output with overthinker, therapist and executive keys
             
-            # Return partial results if available, with error information
-            partial_result = {
-                "original_worry": user_worry,
-                "error": error_msg,
-                "partial_results": {},
-                "metadata": {
-                    "workflow_completed": False,
-                    "error_occurred": True,
-                    "error_details": str(e)
-                }
+        Returns:
+            Result dictionary using the legacy keys expected by the API/frontend
+        """
+        return {
+            "original_worry": user_worry,
+            "overthinker_response": bundle.get("overthinker", ""),
+            "therapist_response": bundle.get("therapist", ""),
+            "executive_summary": bundle.get("executive", ""),
+            "metadata": {
+                "workflow_completed": True,
+                "agent_sequence": ["concierge"],
+                "processing_notes": "Single-call concierge completed successfully"
             }
+        }
+    
+    def process_worries_batch(self, worries: List[str], similarity_threshold: float = 0.93) -> List[Dict[str, Any]]:
+        """
+        Process several worries, calling the LLM once per group of near-duplicates.
+        
+        Worries are embedded in one batched request and grouped by cosine
+        similarity; only one representative per group goes through the agents
+        and its result is shared with the rest of the group. Representatives
+        are processed on up to WORRY_BUTLER_MAX_CONCURRENCY threads, so an
+        Ollama server with OLLAMA_NUM_PARALLEL > 1 decodes them side by side.
+        
+        Args:
+            worries: The user's worry statements
+            similarity_threshold: Minimum cosine similarity for two worries to share a result
             
-            # Include any partial results that were generated before the error
-            if 'bundle' in locals():
-                partial_result["partial_results"].update(bundle)
+        Returns:
+            One result dictionary per input worry, in input order
+        """
+        if not worries:
+            return []
+        
+        representatives = self._group_worries(worries, similarity_threshold)
+        unique = sorted(set(representatives))
+        log.info("Processing %d worries as %d unique request(s)", len(worries), len(unique))
+        workers = max(1, min(len(unique), get_config().max_concurrency))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            processed = dict(zip(unique, pool.map(self.process_worry, [worries[rep] for rep in unique])))
+        
+        return self._fan_out(worries, representatives, processed)
+    
+    async def aprocess_worries_batch(self, worries: List[str], similarity_threshold: float = 0.93) -> List[Dict[str, Any]]:
+        """
+        Async version of process_worries_batch.
+        
+        The unique worries are sent concurrently (up to
+        WORRY_BUTLER_MAX_CONCURRENCY at a time), so an Ollama server started
+        with OLLAMA_NUM_PARALLEL > 1 decodes them in parallel slots instead of
+        one after another.
+        
+        Args:
+            worries: The user's worry statements
+            similarity_threshold: Minimum cosine similarity for two worries to share a result
             
-            raise Exception(error_msg)
+        Returns:
+            One result dictionary per input worry, in input order
+        """
+        if not worries:
+            return []
+        
+        representatives = await asyncio.to_thread(self._group_worries, worries, similarity_threshold)
+        unique = sorted(set(representatives))
+        log.info("Processing %d worries as %d concurrent request(s)", len(worries), len(unique))
+        results = await asyncio.gather(*(self.aprocess_worry(worries[rep]) for rep in unique))
+        
+        return self._fan_out(worries, representatives, dict(zip(unique, results)))
     
-    def get_agent_info(self) -> List[Dict[str, Any]]:
+    def _group_worries(self, worries: List[str], similarity_threshold: float) -> List[int]:
+        """Map each worry to the index of its representative (see cluster_worries)."""
+        try:
+            if self._embed_fn is None:
+                self._embed_fn = get_embedder(
+                    provider=self.provider,
+                    ollama_base_url=self.ollama_base_url
+                )
+            return cluster_worries(worries, self._embed_fn, similarity_threshold)
+        except Exception as e:
+            # Embedding model unavailable - only merge exact duplicates
+            log.warning("Semantic deduplication unavailable, using exact matching: %s", e)
+            return cluster_worries(worries)
+    
+    def _fan_out(self, worries: List[str], representatives: List[int],
+                 processed: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Give every worry its representative's result, marking the shared ones."""
+        results = []
+        for i, rep in enumerate(representatives):
+            result = dict(processed[rep])
+            if i != rep:
+                result["original_worry"] = worries[i]
+                result["metadata"] = dict(result["metadata"], deduplicated_from=worries[rep])
+            results.append(result)
+        
+        return results
+    
+    def get_agent_info(self) -> List[Mapping[str, Any]]:
         """
         Get information about all three agents for debugging and monitoring.
         
         Returns:
-            List of dictionaries containing agent information
+            List of read-only mappings containing agent information
         """
         return [
             self.concierge.get_agent_info(),
         ]
     
-    def get_provider_info(self) -> Dict[str, Any]:
+    def get_provider_info(self) -> Mapping[str, Any]:
         """
         Get information about the current AI provider configuration.
         
+        The configuration is fixed after construction, so the mapping is
+        built on the first call and shared (read-only) afterwards.
+        
         Returns:
-            Dictionary with provider details
+            Read-only mapping with provider details
         """
-        return {
-            "provider": self.provider,
-            "use_openai": self.use_openai,
-            "use_ollama": self.use_ollama,
-            "ollama_model": self.ollama_model,
-            "ollama_base_url": self.ollama_base_url
-        }
+        if self._provider_info is None:
+            self._provider_info = MappingProxyType({
+                "provider": self.provider,
+                "use_openai": self.use_openai,
+                "use_ollama": self.use_ollama,
+                "ollama_model": self.ollama_model,
+                "ollama_base_url": self.ollama_base_url
+            })
+        return self._provider_info
     
     def test_agent_chain(self, test_worry: str = "I'm worried about my presentation tomorrow") -> Dict[str, Any]:
         """
@@ -0,0 +1,67 @@
+"""
+Deduplication of batched worries.
+
+Near-duplicate worries in a batch would each cost a full LLM round-trip.
+Grouping them lets us process one representative per group and share its
+result with the rest of the group.
+"""
+
+import re
+from typing import List, Optional
+
+from .embeddings import EmbedFn, dot, normalize_vector
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_worry(worry: str) -> str:
+    """
+    Normalize a worry for exact comparison (case and whitespace insensitive).
+
+    Args:
+        worry: The user's worry statement
+
+    Returns:
+        The normalized worry text
+    """
+    return _WHITESPACE_RE.sub(" ", worry.strip()).casefold()
+
+
+def cluster_worries(worries: List[str],
+                    embed_fn: Optional[EmbedFn] = None,
+                    threshold: float = 0.93) -> List[int]:
+    """
+    Group near-duplicate worries together.
+
+    Every worry is compared against the representatives found so far and joins
+    the first one whose cosine similarity reaches the threshold; otherwise it
+    becomes a new representative. Without an embedding function only worries
+    that are identical after normalization are grouped.
+
+    Args:
+        worries: The worries to group
+        embed_fn: Optional batched embedding function
+        threshold: Minimum cosine similarity for two worries to be grouped
+
+    Returns:
+        A list mapping each worry index to the index of its representative
+    """
+    if embed_fn is None:
+        first_seen = {}
+        return [first_seen.setdefault(normalize_worry(worry), i) for i, worry in enumerate(worries)]
+
+    # One batched embedding request for the whole list
+    vectors = [normalize_vector(v) for v in embed_fn(list(worries))]
+
+    representatives: List[int] = []
+    assignment: List[int] = []
+    for i, vector in enumerate(vectors):
+        for rep in representatives:
+            if dot(vector, vectors[rep]) >= threshold:
+                assignment.append(rep)
+                break
+        else:
+            representatives.append(i)
+            assignment.append(i)
+
+    return assignment
@@ -0,0 +1,74 @@
+"""
+Embedding helpers for the Worry Butler system.
+
+These let us compare worries by meaning rather than exact wording, e.g.
+"I'm anxious about money" vs "I'm worried about my finances".
+"""
+
+import math
+from typing import Callable, List, Sequence
+
+from .config import get_config
+
+# A batched embedding function: list of texts in, list of vectors out
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+
+def get_embedder(provider: str = "ollama",
+                 ollama_model: str = None,
+                 ollama_base_url: str = None) -> EmbedFn:
+    """
+    Build a batched embedding function for the given provider.
+
+    Args:
+        provider: AI provider to use ("openai" or "ollama")
+        ollama_model: Ollama embedding model (defaults to OLLAMA_EMBED_MODEL or 'nomic-embed-text')
+        ollama_base_url: Base URL for Ollama server
+
+    Returns:
+        A callable that embeds a list of texts in one request
+    """
+    config = get_config()
+    if provider == "openai":
+        try:
+            from langchain_openai import OpenAIEmbeddings
+        except ImportError:
+            raise ImportError("langchain-openai not installed. Run: pip install langchain-openai")
+
+        embeddings = OpenAIEmbeddings(
+            model=config.openai_embed_model,
+            api_key=config.openai_api_key
+        )
+    else:
+        try:
+            from langchain_ollama import OllamaEmbeddings
+        except ImportError:
+            raise ImportError("langchain-ollama not installed. Run: pip install langchain-ollama")
+
+        embeddings = OllamaEmbeddings(
+            model=ollama_model or config.ollama_embed_model,
+            base_url=ollama_base_url or config.ollama_base_url
+        )
+
+    return embeddings.embed_documents
+
+
+def normalize_vector(vector: Sequence[float]) -> List[float]:
+    """
+    Scale a vector to unit length so cosine similarity is a plain dot product.
+
+    Args:
+        vector: The embedding vector
+
+    Returns:
+        The unit-length vector (all zeros stays all zeros)
+    """
+    norm = math.sqrt(sum(x * x for x in vector))
+    if not norm:
+        return list(vector)
+    return [x / norm for x in vector]
+
+
+def dot(a: Sequence[float], b: Sequence[float]) -> float:
+    """Dot product of two equal-length vectors (cosine similarity if both are normalized)."""
+    return sum(x * y for x, y in zip(a, b))
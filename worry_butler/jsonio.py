@@ -0,0 +1,107 @@
+"""
+JSON encoding and decoding for the Worry Butler system.
+
+Uses orjson (a compiled parser, several times faster than the standard
+library) when it is installed and falls back to the json module otherwise.
+Both raise a ValueError subclass on invalid input.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(text: str) -> Any:
+    """
+    Parse a JSON document.
+
+    Args:
+        text: The JSON text
+
+    Returns:
+        The decoded Python object
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def dumps(obj: Any) -> str:
+    """
+    Serialize an object to compact JSON text (non-ASCII characters kept as-is).
+
+    Args:
+        obj: The object to serialize
+
+    Returns:
+        The JSON text
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class JsonObjectScanner:
+    """
+    Finds the first balanced {...} object in text that arrives in pieces.
+
+    Each chunk is scanned once, tracking nesting depth and skipping braces
+    inside string literals (including escaped quotes), so a caller can stop
+    reading a stream as soon as the object is complete. Text before the
+    opening brace is ignored.
+    """
+
+    def __init__(self):
+        self.start = -1  # offset of the opening brace, once seen
+        self.end = -1    # offset just past the matching closing brace, once seen
+        self._offset = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Scan the next piece of text.
+
+        Args:
+            chunk: Text following everything fed so far
+
+        Returns:
+            True once the object is complete (start and end are then set)
+        """
+        if self.end >= 0:
+            return True
+
+        i = 0
+        if self.start < 0:
+            i = chunk.find("{")
+            if i < 0:
+                self._offset += len(chunk)
+                return False
+            self.start = self._offset + i
+
+        for j in range(i, len(chunk)):
+            ch = chunk[j]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = self._offset + j + 1
+                    break
+
+        self._offset += len(chunk)
+        return self.end >= 0